@@ -0,0 +1,126 @@
+"""
+对比每次查询的建连数、DNS 解析次数和传输字节数：
+  - before: 每次 requests.get（每次都重新 DNS 解析 + TCP/TLS 握手）
+  - after:  transport.create_client() 共用客户端
+收发字节在 TCP 层统计（含 TLS 握手、证书和每次请求的头部），
+TLS 的读写在 C 层直接操作文件描述符，包装 send/recv 看不到密文，
+因此在套接字关闭前读取内核的 TCP_INFO 计数（仅 Linux，其它系统显示 "-"）。
+用法: python bench_transport.py [查询次数] [后缀]
+"""
+import ipaddress
+import socket
+import struct
+import sys
+import time
+
+import requests
+
+import transport
+
+API_URL = "https://v2.xxapi.cn/api/whois"
+
+# struct tcp_info 中 tcpi_bytes_acked / tcpi_bytes_received 的偏移（Linux >= 4.1）
+_TCP_INFO_BYTES = struct.Struct("=QQ")
+_TCP_INFO_OFFSET = 120
+
+_stats = {"connections": 0, "dns": 0, "wire": 0}
+_open: set[socket.socket] = set()
+_tcp_info_ok = hasattr(socket, "TCP_INFO")
+
+_orig_connect = socket.socket.connect
+_orig_real_close = socket.socket._real_close
+_orig_getaddrinfo = socket.getaddrinfo
+
+
+def _wire_bytes(sock: socket.socket) -> int:
+    """该连接累计发送（已确认）+ 接收的 TCP 负载字节数"""
+    global _tcp_info_ok
+    if not _tcp_info_ok:
+        return 0
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 256)
+        sent, received = _TCP_INFO_BYTES.unpack_from(info, _TCP_INFO_OFFSET)
+        return sent + received
+    except (OSError, struct.error):
+        _tcp_info_ok = False
+        return 0
+
+
+def _counting_connect(self, *args, **kwargs):
+    _stats["connections"] += 1
+    _open.add(self)
+    return _orig_connect(self, *args, **kwargs)
+
+
+def _counting_real_close(self):
+    # 真正关闭前读出该连接的收发字节
+    if self in _open:
+        _open.discard(self)
+        _stats["wire"] += _wire_bytes(self)
+    return _orig_real_close(self)
+
+
+def _counting_getaddrinfo(host, *args, **kwargs):
+    # 建连时对 IP 字面量的 getaddrinfo 不产生 DNS 查询，不计数
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        _stats["dns"] += 1
+    return _orig_getaddrinfo(host, *args, **kwargs)
+
+
+socket.socket.connect = _counting_connect
+socket.socket._real_close = _counting_real_close
+socket.getaddrinfo = _counting_getaddrinfo
+
+
+def run(get, domains: list[str], close=None) -> dict:
+    for key in _stats:
+        _stats[key] = 0
+    body = 0
+    failed = 0
+    start = time.perf_counter()
+    for d in domains:
+        try:
+            resp = get(API_URL, params={"domain": d}, timeout=10.0)
+            resp.json()
+            body += transport.body_bytes(resp)
+        except Exception:
+            failed += 1
+    elapsed = time.perf_counter() - start
+    if close:
+        close()  # 关闭连接池，统计仍在复用中的连接
+    for sock in list(_open):
+        _stats["wire"] += _wire_bytes(sock)
+        _open.discard(sock)
+    n = len(domains)
+    return {
+        "connections": _stats["connections"] / n,
+        "dns": _stats["dns"] / n,
+        "wire": _stats["wire"] / n if _tcp_info_ok else None,
+        "body": body / n,
+        "seconds": elapsed / n,
+        "failed": failed,
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    suffix = sys.argv[2].lstrip(".") if len(sys.argv) > 2 else "im"
+    domains = [f"a{i}.{suffix}" for i in range(count)]
+
+    before = run(requests.get, domains)
+    client = transport.create_client({API_URL: 1})
+    after = run(client.get, domains, client.close)
+
+    print(f"共 {count} 次查询，客户端: {type(client).__module__}.{type(client).__name__}")
+    print(f"{'':8}{'建连数/次':>10}{'DNS 解析/次':>12}{'TCP 收发字节/次':>16}{'响应体字节/次':>14}"
+          f"{'耗时/次':>10}{'失败':>6}")
+    for name, r in (("before", before), ("after", after)):
+        wire = "-" if r["wire"] is None else f"{r['wire']:.1f}"
+        print(f"{name:8}{r['connections']:>10.2f}{r['dns']:>12.2f}{wire:>16}{r['body']:>14.1f}"
+              f"{r['seconds']:>9.3f}s{r['failed']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 import threading
+import argparse
 import os
 import string
 import itertools
 import time
-import requests
 import sys
 
+import transport
+try:
+    import bulkwhoisapi  # 可选依赖：uv sync --extra bulk
+except ImportError:
+    bulkwhoisapi = None
+from progress import NORMAL, QUIET, VERBOSE, Progress
+from providers import Provider, QuotaStore, Router
+
 # —— 补丁：屏蔽 DummyThread 相关 __del__ 异常 —— #
 def _patch_del(cls_name):
     cls = getattr(threading, cls_name, None)
@@ -31,7 +39,21 @@ OUTPUT_DIR        = "output"
 INPUT_FILE        = os.path.join(OUTPUT_DIR, "input.txt")
 UNREGISTERED_FILE = os.path.join(OUTPUT_DIR, "domain.txt")
 ERROR_FILE        = os.path.join(OUTPUT_DIR, "error.txt")
+LOG_FILE          = os.path.join(OUTPUT_DIR, "scan.log")  # 每个域名的查询结果（JSON Lines）
+QUOTA_FILE        = os.path.join(OUTPUT_DIR, "quota.json")  # 各接口用量记录（跨次运行累计）
+XXAPI_DAILY_QUOTA   = None             # xxapi 每日可用次数，None 表示不限（按自己账号的实际限额填写）
+XXAPI_MONTHLY_QUOTA = None             # xxapi 每月可用次数
+WHOISCX_DAILY_QUOTA   = None           # whoiscx 每日可用次数
+WHOISCX_MONTHLY_QUOTA = None           # whoiscx 每月可用次数
+BULK_API_KEY      = os.environ.get("BULK_WHOIS_API_KEY", "")  # 付费 bulk-whois-api 密钥，留空则不启用
+BULK_COST         = 1.0                # bulk-whois-api 每个域名的费用（按域名计费）
+BULK_MONTHLY_QUOTA = 500               # bulk-whois-api 每月可用域名数
+POOL_SIZE         = 2                  # 每个接口主机的长连接池大小
 # —— 配置结束 —— #
+
+# 所有查询共用一个客户端：长连接复用、DNS 缓存、gzip，装有 httpx[http2] 时走 HTTP/2
+CLIENT = transport.create_client({API_URL: POOL_SIZE, BACKUP_API_URL: POOL_SIZE})
+
 # —— 支持自定义域名后缀 —— #
 suffix: str = input("请输入域名后缀：").replace(".", "")
 DOMAIN_SUFFIX = "." + suffix  # 显式字符串拼接
@@ -42,6 +64,39 @@ def generate_domains() -> list[str]:
     chars = string.digits + string.ascii_lowercase
     return [f"{a}{b}{DOMAIN_SUFFIX}" for a, b in itertools.product(chars, repeat=2)]
 
+def load_wordlist(path: str | None) -> list[str]:
+    """读取优先查询的前缀列表（每行一个，忽略空行和 # 注释）"""
+    if not path:
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.strip().lower() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+def prioritize(domains: list[str], priority: str, wordlist: list[str]) -> list[str]:
+    """
+    按优先级排序候选域名：
+      - wordlist 中的前缀最先，按列表顺序
+      - 其余按 priority：
+          * "letters": 按前缀中数字的个数从少到多（纯字母 → 字母数字混合 → 纯数字）
+          * "digits":  按前缀中数字的个数从多到少（纯数字 → 混合 → 纯字母）
+          * "none":    保持 generate_domains 的原顺序（数字开头的先查）
+      - 同一档内保持原顺序
+    """
+    first = {w: i for i, w in enumerate(wordlist)}
+
+    def key(domain: str):
+        prefix = domain.split(".", 1)[0]
+        digits = sum(c.isdigit() for c in prefix)
+        if priority == "letters":
+            rank = digits
+        elif priority == "digits":
+            rank = -digits
+        else:
+            rank = 0
+        return first.get(prefix, len(first)), rank
+
+    return sorted(domains, key=key)
+
 def ensure_output_dir():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -57,7 +112,7 @@ def query_whois(domain: str, timeout: float = 10.0):
     GET https://v2.xxapi.cn/api/whois?domain=xxx
     """
     try:
-        resp = requests.get(API_URL, params={"domain": domain}, timeout=timeout)
+        resp = CLIENT.get(API_URL, params={"domain": domain}, timeout=timeout)
         resp.raise_for_status()
         return resp.status_code, resp.json()
     except Exception as e:
@@ -69,7 +124,7 @@ def query_whois_backup(domain: str, timeout: float = 10.0):
     GET https://api.whoiscx.com/whois/?domain=xxx&raw=1
     """
     try:
-        resp = requests.get(BACKUP_API_URL, params={"domain": domain, "raw": 1}, timeout=timeout)
+        resp = CLIENT.get(BACKUP_API_URL, params={"domain": domain, "raw": 1}, timeout=timeout)
         resp.raise_for_status()
         return resp.status_code, resp.json()
     except Exception as e:
@@ -103,52 +158,165 @@ def determine_status_backup(http_status, payload) -> str:
         return "unregistered" if raw_text.startswith("Not found") else "registered"
     return "failed"
 
-def check_domain(domain: str) -> dict:
-    # 首先使用新API查询
-    code, data = query_whois(domain)
-    status = determine_status(code, data)
-    
-    # 如果新API查询失败，则使用备用API查询
-    if status == "failed":
-        code, data = query_whois_backup(domain)
-        status = determine_status_backup(code, data)
-    
+def query_whois_bulk(domain: str, timeout: float = 10.0):
+    """
+    调用付费 bulk-whois-api（按域名计费），返回 (HTTP 状态码, 记录 或 错误字符串)
+    bulk-whois-api 客户端不支持设置超时（注册时 honors_timeout=False，由路由器在时间不足时跳过）
+    创建请求失败时返回 None（未计费）；请求已创建（已计费）后取结果失败返回 200 + 错误字符串
+    """
+    try:
+        client = bulkwhoisapi.Client(api_key=BULK_API_KEY)
+        req = client.create_request(domains=[domain])
+    except Exception as e:
+        return None, str(e)
+    try:
+        result = client.get_records(request_id=req.request_id, max_records=1)
+        return 200, result.whois_records[0]
+    except Exception as e:
+        return 200, str(e)
+
+def determine_status_bulk(http_status, payload) -> str:
+    """
+    根据 bulk-whois-api 记录的 domain_status 判断状态：
+      - "I" → "unregistered"
+      - "N" → "registered"
+      - 其它情况 → "failed"
+    """
+    if http_status == 200:
+        status = getattr(payload, "domain_status", None)
+        if status == "I":
+            return "unregistered"
+        if status == "N":
+            return "registered"
+    return "failed"
+
+def build_router() -> Router:
+    """注册所有可用接口：免费接口优先，付费接口仅在配置了密钥时启用"""
+    providers = [
+        Provider("xxapi", query_whois, determine_status, cost=0.0, max_latency=5.0,
+                 daily_quota=XXAPI_DAILY_QUOTA, monthly_quota=XXAPI_MONTHLY_QUOTA),
+        Provider("whoiscx", query_whois_backup, determine_status_backup, cost=0.0, max_latency=5.0,
+                 daily_quota=WHOISCX_DAILY_QUOTA, monthly_quota=WHOISCX_MONTHLY_QUOTA),
+    ]
+    if BULK_API_KEY and bulkwhoisapi is None:
+        print("已设置 BULK_WHOIS_API_KEY 但未安装 bulk-whois-api（uv sync --extra bulk），不启用付费接口。")
+    elif BULK_API_KEY:
+        providers.append(Provider("bulkwhoisapi", query_whois_bulk, determine_status_bulk,
+                                  cost=BULK_COST, monthly_quota=BULK_MONTHLY_QUOTA, max_latency=30.0,
+                                  honors_timeout=False))
+    return Router(providers, QuotaStore(QUOTA_FILE))
+
+def check_domain(domain: str, router: Router, deadline: float | None = None) -> dict:
+    # 由路由器按费用、额度和健康度依次选择接口，整次查询不超过 deadline
+    status, code, data, provider = router.check(domain, deadline)
+
     error = None
     if status == "failed":
         error = data if code is None else f"HTTP {code}: {data}"
-    
-    return {"domain": domain, "status": status, "http_code": code, "error": error}
+
+    return {"domain": domain, "status": status, "http_code": code, "error": error, "provider": provider}
 
 def write_list_to_file(lst: list[str], path: str):
     with open(path, "w", encoding="utf-8") as f:
         f.write("\n".join(lst))
 
+class EarlyStop:
+    """
+    “前 K 个可用”模式：
+      - 每找到一个未注册域名立即追加写入 domain.txt
+      - 找满 target 个或超过 deadline 秒后 reason() 返回停止原因
+    target / deadline 为 0 表示不限
+    """
+
+    def __init__(self, target: int, deadline: float):
+        self.target = target
+        self.deadline = time.monotonic() + deadline if deadline else None
+        self.found = 0
+        write_list_to_file([], UNREGISTERED_FILE)
+
+    def add(self, res: dict):
+        if res["status"] == "unregistered":
+            self.found += 1
+            with open(UNREGISTERED_FILE, "a", encoding="utf-8") as f:
+                f.write(("\n" if self.found > 1 else "") + res["domain"])
+
+    def remaining(self) -> float:
+        """距离截止时间的秒数（不限时为 inf）"""
+        return float("inf") if self.deadline is None else max(self.deadline - time.monotonic(), 0.0)
+
+    def reason(self) -> str | None:
+        if self.target and self.found >= self.target:
+            return f"已找到 {self.found} 个未注册域名"
+        if self.remaining() <= 0:
+            return "已到截止时间"
+        return None
+
+    def sleep(self, seconds: float):
+        time.sleep(min(seconds, self.remaining()))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="查询两字符短域名是否可注册")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("-v", "--verbose", action="store_true",
+                       help=f"在 {LOG_FILE} 中记录每个域名的结果（默认只记录未注册和失败的域名）")
+    group.add_argument("-q", "--quiet", action="store_true", help="不写日志文件")
+    parser.add_argument("-k", "--first", type=int, default=0, metavar="K",
+                        help="找到 K 个未注册域名后立即停止（默认查完全部）")
+    parser.add_argument("-d", "--deadline", type=float, default=0, metavar="SECONDS",
+                        help="最长查询时间（秒），到时立即停止（默认不限）")
+    parser.add_argument("-p", "--priority", choices=["letters", "digits", "none"], default="none",
+                        help="查询顺序：字母优先 / 数字优先 / 原顺序（默认原顺序）")
+    parser.add_argument("-w", "--wordlist", metavar="FILE",
+                        help="优先查询的前缀列表文件，每行一个")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    verbosity = VERBOSE if args.verbose else QUIET if args.quiet else NORMAL
+    progress = None
+    router = None
     try:
         ensure_output_dir()
 
-        # 1. 生成 & 保存所有域名
-        domains = generate_domains()
+        # 1. 生成 & 按优先级排序 & 保存所有域名
+        domains = prioritize(generate_domains(), args.priority, load_wordlist(args.wordlist))
         save_domains(domains)
         total = len(domains)
         print(f"已生成 {total} 个 {DOMAIN_SUFFIX} 域名，写入 {INPUT_FILE}")
+
+        # 检查剩余额度，避免扫描中途撞上额度上限
+        router = build_router()
+        print(f"接口用量：\n{router.summary()}")
+        need = total * (1 + MAX_RETRIES)
+        if router.capacity() < total and not (args.first or args.deadline):
+            print(f"剩余额度 {int(router.capacity())} 次，不足以完成 {total} 个域名的查询，请更换时间或补充额度。")
+            return
+        if router.capacity() < need:
+            print(f"警告：剩余额度 {int(router.capacity())} 次，可能不足以完成全部 {MAX_RETRIES} 轮重试（最多 {need} 次）。")
+        if router.capacity() == float("inf"):
+            print("提示：有接口未声明额度（XXAPI_* / WHOISCX_* 配置），无法预估本次扫描是否会用完额度。")
         time.sleep(1)
 
         # 2. 初始查询
         results = {}  # domain -> result dict
         print("开始初始查询…")
-        
+        stop = EarlyStop(args.first, args.deadline)
+        progress = Progress(router, LOG_FILE, verbosity)
+        progress.start_round("初始查询", total)
+
         # 域名查询循环
-        for idx, d in enumerate(domains, start=1):
-            res = check_domain(d)
+        for d in domains:
+            if stop.reason():
+                break
+            res = check_domain(d, router, stop.deadline)
             results[d] = res
+            stop.add(res)
+            progress.update(res)
 
-            mark = {"registered":"🔴 已注册","unregistered":"🟢 未注册","failed":"🟡 查询失败"}[res["status"]]
-            detail = f"(HTTP {res['http_code']})" + (f" 错误：{res['error']}" if res["error"] else "")
-            percent = idx / total * 100
-            print(f"{d}: {mark} {detail}   [{idx}/{total}, {percent:.2f}%]")
-
-            time.sleep(DELAY_SECONDS)
+            if not stop.reason():
+                stop.sleep(DELAY_SECONDS)
+        progress.finish()
+        router.save()
 
         # 3. 写入初始失败列表
         error_domains = [d for d,r in results.items() if r["status"] == "failed"]
@@ -159,20 +327,29 @@ def main():
         for attempt in range(1, MAX_RETRIES + 1):
             if not error_domains:
                 break
+            if not router.available():
+                print("所有接口额度已用完，停止重试。")
+                break
+            if stop.reason():
+                break
             print(f"第 {attempt} 次重试，共 {len(error_domains)} 个域名…")
+            progress.start_round(f"重试 {attempt}", len(error_domains))
             new_errors = []
-            for idx, d in enumerate(error_domains, start=1):
-                res = check_domain(d)
+            for i, d in enumerate(error_domains):
+                if stop.reason():
+                    new_errors.extend(error_domains[i:])  # 未重试的仍算失败
+                    break
+                res = check_domain(d, router, stop.deadline)
                 results[d] = res
-
-                mark = {"registered":"🔴 已注册","unregistered":"🟢 未注册","failed":"🟡 查询失败"}[res["status"]]
-                detail = f"(HTTP {res['http_code']})" + (f" 错误：{res['error']}" if res["error"] else "")
-                percent = idx / len(error_domains) * 100
-                print(f"重试 {attempt} - {d}: {mark} {detail}   [{idx}/{len(error_domains)}, {percent:.2f}%]")
+                stop.add(res)
+                progress.update(res)
 
                 if res["status"] == "failed":
                     new_errors.append(d)
-                time.sleep(DELAY_SECONDS)
+                if not stop.reason():
+                    stop.sleep(DELAY_SECONDS)
+            progress.finish()
+            router.save()
 
             error_domains = new_errors
             write_list_to_file(error_domains, ERROR_FILE)
@@ -182,14 +359,24 @@ def main():
         unreg = [d for d,r in results.items() if r["status"] == "unregistered"]
         write_list_to_file(unreg, UNREGISTERED_FILE)
 
+        if stop.reason():
+            print(f"{stop.reason()}，提前结束（已查询 {len(results)}/{total} 个）。")
         print(f"所有查询结束：未注册 {len(unreg)} 个（已写入 {UNREGISTERED_FILE}），"
               f"最终失败 {len(error_domains)} 个（见 {ERROR_FILE}）。")
+        print(f"接口用量：\n{router.summary()}")
+        if verbosity > QUIET:
+            print(f"详细结果见 {LOG_FILE}")
     except KeyboardInterrupt:
         print("\n程序已终止。")
         sys.exit(0)
     except Exception as e:
         print(f"\n发生未知异常: {str(e)}")
         sys.exit(1)
+    finally:
+        if progress:
+            progress.close()
+        if router:
+            router.save()  # 用量分批写入，退出前补写
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
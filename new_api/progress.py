@@ -0,0 +1,108 @@
+import json
+import sys
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from providers import Router
+
+REFRESH_INTERVAL  = 0.25  # 终端面板刷新间隔（秒）
+PLAIN_INTERVAL    = 5.0   # 输出不是终端时（如重定向到文件）的打印间隔（秒）
+RECENT_FINDS      = 5     # 面板上显示最近几个未注册域名
+LOG_BUFFER        = 1 << 16
+
+# 日志详细程度
+QUIET   = 0  # 不写日志文件
+NORMAL  = 1  # 只记录未注册和失败的域名
+VERBOSE = 2  # 记录每个域名
+
+LABELS = {"registered": "🔴 已注册", "unregistered": "🟢 未注册", "failed": "🟡 失败"}
+
+
+class Progress:
+    """
+    节流刷新的扫描进度面板：
+      - 终端上每秒最多刷新几次，显示各状态计数、速度、预计剩余时间、接口健康度和最近发现
+      - 每个域名的结果以 JSON Lines 写入带缓冲的日志文件，不再逐行打印到终端
+    无论查询速度多快，终端输出的开销都是固定的。
+    """
+
+    def __init__(self, router: Router, log_path: str, verbosity: int = NORMAL):
+        self.router = router
+        self.verbosity = verbosity
+        self.log = open(log_path, "a", encoding="utf-8", buffering=LOG_BUFFER) if verbosity > QUIET else None
+        self.tty = sys.stdout.isatty()
+        self.interval = REFRESH_INTERVAL if self.tty else PLAIN_INTERVAL
+        self.recent = deque(maxlen=RECENT_FINDS)
+        self.lines = 0  # 上次绘制的行数，用于原地覆盖
+        self.start_round("初始查询", 0)
+
+    def start_round(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.counts = Counter()
+        self.started = time.monotonic()
+        self.last_render = 0.0
+        self.lines = 0
+
+    def update(self, res: dict):
+        self.done += 1
+        self.counts[res["status"]] += 1
+        if res["status"] == "unregistered":
+            self.recent.append(res["domain"])
+        if self.log and (self.verbosity >= VERBOSE or res["status"] != "registered"):
+            self.log.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"),
+                                       "round": self.label, **res}, ensure_ascii=False) + "\n")
+        now = time.monotonic()
+        if now - self.last_render >= self.interval:
+            self.render(now)
+
+    def render(self, now: float | None = None):
+        now = now or time.monotonic()
+        self.last_render = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        percent = self.done / self.total * 100 if self.total else 100.0
+
+        counts = "  ".join(f"{LABELS[s]} {self.counts[s]}" for s in LABELS)
+        health = "  ".join(self._provider(p) for p in self.router.providers)
+        lines = [
+            f"{self.label}: [{self.done}/{self.total}, {percent:.2f}%]  {rate:.2f} 个/秒  预计剩余 {eta:.0f}s",
+            f"  {counts}",
+            f"  接口: {health}",
+            f"  最近发现: {', '.join(self.recent) or '-'}",
+        ]
+        if self.tty:
+            # 光标回到上次面板开头并逐行覆盖
+            up = f"\x1b[{self.lines}F" if self.lines else ""
+            sys.stdout.write(up + "".join(f"\x1b[2K{line}\n" for line in lines))
+            sys.stdout.flush()
+            self.lines = len(lines)
+        else:
+            print(" |".join(lines), flush=True)
+
+    def _provider(self, p) -> str:
+        left = self.router.remaining(p)
+        if left <= 0:
+            state = "额度用完"
+        elif self.router.cooling(p):
+            state = "冷却"
+        elif self.router.slow(p):
+            state = "过慢"
+        else:
+            state = "正常"
+        latency = self.router.store.latency(p.name)
+        return f"{p.name}({state}, {'-' if latency is None else f'{latency:.2f}s'})"
+
+    def finish(self):
+        """绘制本轮最终状态，并把日志缓冲写入磁盘"""
+        self.render()
+        if self.log:
+            self.log.flush()
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
@@ -0,0 +1,214 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+# —— 健康度参数 —— #
+LATENCY_ALPHA      = 0.2   # 延迟 EWMA 平滑系数
+FAILURE_THRESHOLD  = 3     # 连续失败多少次后进入冷却
+COOLDOWN_SECONDS   = 60    # 冷却时长（秒）；过慢的接口也在这段时间后重新试探
+SAVE_EVERY         = 50    # 免费接口每记录多少次写一次用量文件（付费接口每次都写）
+
+
+@dataclass
+class Provider:
+    """
+    一个 WHOIS 后端：
+      - query(domain, timeout) -> (HTTP 状态码, JSON 数据 或 错误字符串)
+      - determine(http_status, payload) -> "registered" / "unregistered" / "failed"
+      - cost: 每次查询的费用（免费接口为 0）
+      - daily_quota / monthly_quota: 每日 / 每月可用次数，None 表示不限
+      - max_latency: 可接受的平均延迟（秒），超过则视为过慢
+      - honors_timeout: query 是否遵守 timeout；不遵守的接口在距截止时间不足 max_latency 时跳过
+    """
+    name: str
+    query: Callable[[str, float], tuple[Any, Any]]
+    determine: Callable[[Any, Any], str]
+    cost: float = 0.0
+    daily_quota: int | None = None
+    monthly_quota: int | None = None
+    max_latency: float = 5.0
+    honors_timeout: bool = True
+    # 运行时状态
+    consecutive_failures: int = field(default=0, repr=False)
+    cooldown_until: float = field(default=0.0, repr=False)
+    last_sample: float = field(default=float("-inf"), repr=False)  # 本次运行最近一次延迟采样的时间
+
+
+class QuotaStore:
+    """把各接口的用量、花费和观测到的延迟持久化到 JSON 文件，跨次运行累计"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.unsaved = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.data: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def _entry(self, name: str) -> dict:
+        today = datetime.now().strftime("%Y-%m-%d")
+        month = today[:7]
+        e = self.data.setdefault(name, {})
+        # 跨天 / 跨月自动清零
+        if e.get("day") != today:
+            e["day"], e["day_used"] = today, 0
+        if e.get("month") != month:
+            e["month"], e["month_used"] = month, 0
+        e.setdefault("spent", 0.0)
+        return e
+
+    def used(self, name: str) -> tuple[int, int]:
+        """返回 (今日已用, 本月已用)"""
+        e = self._entry(name)
+        return e["day_used"], e["month_used"]
+
+    def latency(self, name: str) -> float | None:
+        return self.data.get(name, {}).get("latency")
+
+    def charge(self, name: str, cost: float):
+        """记一次实际到达接口的调用"""
+        e = self._entry(name)
+        e["day_used"] += 1
+        e["month_used"] += 1
+        e["spent"] = round(e["spent"] + cost, 6)
+        self.unsaved += 1
+        # 付费调用立即落盘，免费调用攒一批再写
+        if cost > 0 or self.unsaved >= SAVE_EVERY:
+            self.save()
+
+    def sample(self, name: str, latency: float):
+        """记一次成功查询的延迟（EWMA）"""
+        e = self._entry(name)
+        old = e.get("latency")
+        e["latency"] = latency if old is None else old + LATENCY_ALPHA * (latency - old)
+
+    def save(self):
+        self.unsaved = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)  # 原子替换，中途退出也不会写坏文件
+
+
+class Router:
+    """
+    按费用和健康度为每次查询选择接口：
+      1. 额度已用完的接口直接跳过
+      2. 只要还有一个免费接口有额度且不在冷却中，就不调用付费接口
+         （单个域名在免费接口上失败只会留给后续重试轮，不会直接花钱）
+      3. 因连续失败而在冷却中的接口排到最后
+      4. 其余按费用从低到高；同一费用下，不过慢的优先，再按延迟排序
+    因此付费接口只会在所有免费接口额度用完或都因连续失败而冷却时才被调用。
+    延迟只统计成功的查询；过慢的接口在 COOLDOWN_SECONDS 后会被重新试探，旧的延迟数据随之淡出。
+    """
+
+    def __init__(self, providers: list[Provider], store: QuotaStore):
+        self.providers = providers
+        self.store = store
+
+    def remaining(self, p: Provider) -> float:
+        """该接口剩余可用次数（不限额度时为 inf）"""
+        day_used, month_used = self.store.used(p.name)
+        left = float("inf")
+        if p.daily_quota is not None:
+            left = min(left, p.daily_quota - day_used)
+        if p.monthly_quota is not None:
+            left = min(left, p.monthly_quota - month_used)
+        return max(left, 0)
+
+    def cooling(self, p: Provider) -> bool:
+        """是否因连续失败而在冷却中"""
+        return time.monotonic() < p.cooldown_until
+
+    def slow(self, p: Provider) -> bool:
+        """平均延迟超标，且本次运行在 COOLDOWN_SECONDS 内采样过（否则需要重新试探）"""
+        latency = self.store.latency(p.name)
+        return (latency is not None and latency > p.max_latency
+                and time.monotonic() - p.last_sample < COOLDOWN_SECONDS)
+
+    def healthy(self, p: Provider) -> bool:
+        return not self.cooling(p) and not self.slow(p)
+
+    def order(self) -> list[Provider]:
+        """返回本次查询应依次尝试的接口列表"""
+        candidates = [p for p in self.providers if self.remaining(p) > 0]
+        if any(p.cost == 0 and not self.cooling(p) for p in candidates):
+            candidates = [p for p in candidates if p.cost == 0]
+        return sorted(candidates, key=lambda p: (
+            self.cooling(p),
+            p.cost,
+            self.slow(p),
+            self.store.latency(p.name) or 0.0,
+        ))
+
+    def available(self) -> bool:
+        return any(self.remaining(p) > 0 for p in self.providers)
+
+    def capacity(self) -> float:
+        """所有接口剩余可用次数之和"""
+        return sum(self.remaining(p) for p in self.providers)
+
+    def record(self, p: Provider, status: str, latency: float):
+        """更新健康度：失败（含超时）只计入连续失败次数，成功才采样延迟"""
+        if status == "failed":
+            p.consecutive_failures += 1
+            if p.consecutive_failures >= FAILURE_THRESHOLD:
+                p.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+                p.consecutive_failures = 0
+        else:
+            p.consecutive_failures = 0
+            p.last_sample = time.monotonic()
+            self.store.sample(p.name, latency)
+
+    def save(self):
+        self.store.save()
+
+    def check(self, domain: str, deadline: float | None = None,
+              timeout: float = 10.0) -> tuple[str, Any, Any, str | None]:
+        """
+        依次尝试各接口，直到得到确定结果
+        deadline 为 time.monotonic() 的截止时刻；每个接口的超时取 timeout 与剩余时间中较小者，
+        被截止时间截断的失败不计入健康度和延迟
+        返回 (状态, HTTP 状态码, JSON 数据 或 错误字符串, 使用的接口名)
+        """
+        status, code, data, used = "failed", None, "所有接口额度已用完", None
+        for p in self.order():
+            left = float("inf") if deadline is None else deadline - time.monotonic()
+            if left <= 0:
+                status, code, data = "failed", None, "已到截止时间"
+                break
+            if not p.honors_timeout and left < p.max_latency:
+                if used is None:
+                    status, code, data = "failed", None, "距截止时间不足"
+                continue
+            start = time.perf_counter()
+            code, data = p.query(domain, min(timeout, left))
+            status = p.determine(code, data)
+            if code is not None:  # 没有收到响应（未安装依赖、连接失败等）不计用量和费用
+                self.store.charge(p.name, p.cost)
+            cut = deadline is not None and left < timeout and time.monotonic() >= deadline
+            if not (status == "failed" and cut):
+                self.record(p, status, time.perf_counter() - start)
+            used = p.name
+            if status != "failed":
+                break
+        return status, code, data, used
+
+    def summary(self) -> str:
+        lines = []
+        for p in self.providers:
+            day_used, month_used = self.store.used(p.name)
+            left = self.remaining(p)
+            latency = self.store.latency(p.name)
+            lines.append(
+                f"  {p.name}: 今日 {day_used} 次 / 本月 {month_used} 次，"
+                f"剩余 {'不限' if left == float('inf') else int(left)}，"
+                f"单价 {p.cost}，累计花费 {self.store.data.get(p.name, {}).get('spent', 0.0)}，"
+                f"平均延迟 {'-' if latency is None else f'{latency:.2f}s'}"
+            )
+        return "\n".join(lines)
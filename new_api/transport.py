@@ -0,0 +1,127 @@
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    import httpx
+except ImportError:
+    httpx = None
+
+DNS_TTL         = 300    # 接口域名解析结果缓存时长（秒）
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+_dns_cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+_dns_lock = threading.Lock()
+
+
+def resolve(host: str, port: int) -> list[str]:
+    """解析主机的全部地址（按系统返回顺序去重）并缓存 DNS_TTL 秒"""
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    with _dns_lock:
+        _dns_cache[key] = (now + DNS_TTL, addresses)
+    return addresses
+
+
+def forget(host: str, port: int):
+    """所有缓存的地址都连不上时丢弃缓存，下次重新解析"""
+    with _dns_lock:
+        _dns_cache.pop((host, port), None)
+
+
+class _CachedDNSMixin:
+    """
+    建连时依次尝试缓存中的每个地址（与 urllib3 原本的 create_connection 一致），
+    尝试期间临时把 _dns_host 换成该地址，结束后换回；
+    SNI、证书校验和 Host 头仍使用原域名（urllib3 的 host 属性读取的就是 _dns_host）
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        error = None
+        try:
+            for address in resolve(host, self.port):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        forget(host, self.port)
+        raise error
+
+
+class _CachedHTTPConnection(_CachedDNSMixin, HTTPConnection):
+    pass
+
+
+class _CachedHTTPSConnection(_CachedDNSMixin, HTTPSConnection):
+    pass
+
+
+class _CachedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedHTTPConnection
+
+
+class _CachedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedHTTPSConnection
+
+
+class CachedDNSAdapter(HTTPAdapter):
+    """只对挂载了本适配器的主机生效的 DNS 缓存，不影响进程内其它连接"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedHTTPConnectionPool,
+            "https": _CachedHTTPSConnectionPool,
+        }
+
+
+def create_client(pools: dict[str, int]):
+    """
+    创建所有查询共用的 HTTP 客户端
+    pools: {接口 URL: 该主机的长连接池大小}
+    安装了 httpx[http2] 时使用 HTTP/2 多路复用，否则使用带连接池和 DNS 缓存的 requests.Session
+    两者都支持 client.get(url, params=..., timeout=...)，返回值都有 status_code / raise_for_status() / json()
+    """
+    if httpx is not None:
+        # 每个主机单独一个传输层，连接上限互不影响；
+        # HTTP/2 下每个主机只需一条长连接，解析只在建连时发生一次，不另做 DNS 缓存
+        mounts = {}
+        for url, size in pools.items():
+            parts = urlsplit(url)
+            limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+            mounts[f"{parts.scheme}://{parts.netloc}"] = httpx.HTTPTransport(http2=True, limits=limits)
+        return httpx.Client(http2=True, headers=DEFAULT_HEADERS, mounts=mounts)
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    for url, size in pools.items():
+        parts = urlsplit(url)
+        # 每个主机单独挂载适配器，连接池大小互不影响
+        session.mount(f"{parts.scheme}://{parts.netloc}/",
+                      CachedDNSAdapter(pool_connections=1, pool_maxsize=size))
+    return session
+
+
+def body_bytes(resp) -> int:
+    """响应体在网络上传输的字节数（压缩后）"""
+    if hasattr(resp, "num_bytes_downloaded"):  # httpx
+        return resp.num_bytes_downloaded
+    return resp.raw.tell()  # requests / urllib3
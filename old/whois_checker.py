@@ -3,7 +3,10 @@ import os
 import string
 import itertools
 import aiohttp
+import json
 import sys
+import time
+from collections import Counter, deque
 from datetime import datetime
 
 # —— 配置区 —— #
@@ -16,6 +19,16 @@ OUTPUT_DIR = "output"
 INPUT_FILE = os.path.join(OUTPUT_DIR, "input.txt")
 UNREGISTERED_FILE = os.path.join(OUTPUT_DIR, "domain.txt")
 ERROR_FILE = os.path.join(OUTPUT_DIR, "error.txt")
+LOG_FILE = os.path.join(OUTPUT_DIR, "scan.log")  # 每个域名的查询结果（JSON Lines）
+VERBOSITY = 1  # 日志详细程度：0 不写日志 / 1 只记录未注册和失败的域名 / 2 记录每个域名
+REFRESH_INTERVAL = 0.25  # 终端进度面板刷新间隔（秒）
+PLAIN_INTERVAL = 5.0  # 输出不是终端时（如重定向到文件）的打印间隔（秒）
+DNS_TTL = 300  # 接口域名解析结果缓存时长（秒）
+KEEPALIVE_TIMEOUT = 30  # 空闲长连接保留时长（秒）
+FIRST_K = 0  # 找到 K 个未注册域名后立即停止并取消其余请求（0 表示查完全部）
+DEADLINE = 0  # 最长查询时间（秒），到时取消其余请求（0 表示不限）
+PRIORITY = "none"  # 查询顺序："letters" 字母优先 / "digits" 数字优先 / "none" 原顺序
+WORDLIST_FILE = None  # 优先查询的前缀列表文件（每行一个），None 表示不使用
 
 # —— 支持自定义域名后缀 —— #
 suffix = input("请输入域名后缀：").replace(".", "")
@@ -29,6 +42,57 @@ def generate_domains() -> list[str]:
     return [f"{a}{b}{DOMAIN_SUFFIX}" for a, b in itertools.product(chars, repeat=2)]
 
 
+def create_session() -> aiohttp.ClientSession:
+    """
+    创建所有查询共用的会话：
+    每个接口主机最多 CONCURRENT_LIMIT 条长连接，缓存 DNS 解析结果，请求 gzip 压缩响应
+    """
+    connector = aiohttp.TCPConnector(
+        limit=CONCURRENT_LIMIT * 2,  # 主接口 + 备用接口
+        limit_per_host=CONCURRENT_LIMIT,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, headers={"Accept-Encoding": "gzip, deflate"})
+
+
+def load_wordlist(path: str | None) -> list[str]:
+    """读取优先查询的前缀列表（每行一个，忽略空行和 # 注释）"""
+    if not path:
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.strip().lower() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def prioritize(domains: list[str], priority: str, wordlist: list[str]) -> list[str]:
+    """
+    按优先级排序候选域名：
+      - wordlist 中的前缀最先，按列表顺序
+      - 其余按 priority：
+          * "letters": 按前缀中数字的个数从少到多（纯字母 → 字母数字混合 → 纯数字）
+          * "digits":  按前缀中数字的个数从多到少（纯数字 → 混合 → 纯字母）
+          * "none":    保持 generate_domains 的原顺序（数字开头的先查）
+      - 同一档内保持原顺序
+    任务按此顺序创建，信号量按先来先得放行，因此高优先级的域名先被查询
+    """
+    first = {w: i for i, w in enumerate(wordlist)}
+
+    def key(domain: str):
+        prefix = domain.split(".", 1)[0]
+        digits = sum(c.isdigit() for c in prefix)
+        if priority == "letters":
+            rank = digits
+        elif priority == "digits":
+            rank = -digits
+        else:
+            rank = 0
+        return first.get(prefix, len(first)), rank
+
+    return sorted(domains, key=key)
+
+
 def ensure_output_dir():
     """确保输出目录存在"""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -100,21 +164,100 @@ def determine_status_backup(http_status, payload) -> str:
 
 
 async def check_domain(domain: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> dict:
+    # 旧版本只有两个免费接口，固定按 xxapi → whoiscx 顺序查询；
+    # 按费用 / 额度 / 健康度选择接口的路由只在 new_api/providers.py 中实现
     async with semaphore:
         # 首先使用新 API 查询
+        provider = "xxapi"
         code, data = await query_whois(domain, session)
         status = determine_status(code, data)
 
         # 如果新 API 查询失败，则使用备用 API 查询
         if status == "failed":
+            provider = "whoiscx"
             code, data = await query_whois_backup(domain, session)
             status = determine_status_backup(code, data)
 
         error = None
         if status == "failed":
+            provider = None
             error = data if code is None else f"HTTP {code}: {data}"
 
-        return {"domain": domain, "status": status, "http_code": code, "error": error}
+        return {"domain": domain, "status": status, "http_code": code, "error": error, "provider": provider}
+
+
+class Progress:
+    """
+    扫描进度面板：
+      - 后台任务每 REFRESH_INTERVAL 秒重绘一次，显示各状态计数、速度、预计剩余时间、接口健康度和最近发现
+      - 每个域名的结果以 JSON Lines 写入带缓冲的日志文件，不再逐行打印到终端
+    """
+
+    LABELS = {"registered": "🔴 已注册", "unregistered": "🟢 未注册", "failed": "🟡 失败"}
+
+    def __init__(self, log_path: str, verbosity: int = VERBOSITY):
+        self.verbosity = verbosity
+        self.log = open(log_path, "a", encoding="utf-8", buffering=1 << 16) if verbosity > 0 else None
+        self.tty = sys.stdout.isatty()
+        self.interval = REFRESH_INTERVAL if self.tty else PLAIN_INTERVAL
+        self.recent = deque(maxlen=5)
+        self.answered = Counter()  # 接口名 -> 给出确定结果的次数，None 表示两个接口都失败
+        self.start_round("初始查询", 0)
+
+    def start_round(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.counts = Counter()
+        self.started = time.monotonic()
+        self.lines = 0
+
+    def update(self, res: dict):
+        self.done += 1
+        self.counts[res["status"]] += 1
+        self.answered[res.get("provider")] += 1
+        if res["status"] == "unregistered":
+            self.recent.append(res["domain"])
+        if self.log and (self.verbosity >= 2 or res["status"] != "registered"):
+            self.log.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"),
+                                       "round": self.label, **res}, ensure_ascii=False) + "\n")
+
+    def render(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        percent = self.done / self.total * 100 if self.total else 100.0
+
+        # 备用接口被调用即说明主接口失败；两者都失败记为 None
+        primary_failed = self.answered["whoiscx"] + self.answered[None]
+        counts = "  ".join(f"{label} {self.counts[s]}" for s, label in self.LABELS.items())
+        health = (f"xxapi 成功 {self.answered['xxapi']} / 失败 {primary_failed}  "
+                  f"whoiscx 成功 {self.answered['whoiscx']} / 失败 {self.answered[None]}")
+        lines = [
+            f"{self.label}: [{self.done}/{self.total}, {percent:.2f}%]  {rate:.2f} 个/秒  预计剩余 {eta:.0f}s",
+            f"  {counts}",
+            f"  接口: {health}",
+            f"  最近发现: {', '.join(self.recent) or '-'}",
+        ]
+        if self.tty:
+            # 光标回到上次面板开头并逐行覆盖
+            up = f"\x1b[{self.lines}F" if self.lines else ""
+            sys.stdout.write(up + "".join(f"\x1b[2K{line}\n" for line in lines))
+            sys.stdout.flush()
+            self.lines = len(lines)
+        else:
+            print(" |".join(lines), flush=True)
+
+    async def refresh(self):
+        """后台定时重绘，直到被取消"""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.render()
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
 
 
 def write_list_to_file(lst: list[str], path: str):
@@ -122,12 +265,83 @@ def write_list_to_file(lst: list[str], path: str):
         f.write("\n".join(lst))
 
 
+class EarlyStop:
+    """
+    “前 K 个可用”模式：
+      - 每找到一个未注册域名立即追加写入 domain.txt
+      - 找满 target 个或超过 deadline 秒后 reason() 返回停止原因
+    target / deadline 为 0 表示不限
+    """
+
+    def __init__(self, target: int, deadline: float):
+        self.target = target
+        self.deadline = time.monotonic() + deadline if deadline else None
+        self.found = 0
+        write_list_to_file([], UNREGISTERED_FILE)
+
+    def add(self, res: dict):
+        if res["status"] == "unregistered":
+            self.found += 1
+            with open(UNREGISTERED_FILE, "a", encoding="utf-8") as f:
+                f.write(("\n" if self.found > 1 else "") + res["domain"])
+
+    def remaining(self) -> float:
+        """距离截止时间的秒数（不限时为 inf）"""
+        return float("inf") if self.deadline is None else max(self.deadline - time.monotonic(), 0.0)
+
+    def reason(self) -> str | None:
+        if self.target and self.found >= self.target:
+            return f"已找到 {self.found} 个未注册域名"
+        if self.remaining() <= 0:
+            return "已到截止时间"
+        return None
+
+
+async def run_round(domains: list[str], session: aiohttp.ClientSession, progress: Progress,
+                    label: str, stop: EarlyStop) -> dict:
+    """
+    并发查询一轮，按完成顺序记录结果，期间后台定时刷新进度面板
+    满足停止条件时取消仍在排队或进行中的请求，返回已完成的 domain -> result dict
+    """
+    results = {}
+    progress.start_round(label, len(domains))
+    refresher = asyncio.create_task(progress.refresh())
+    semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
+    tasks = {asyncio.create_task(check_domain(d, session, semaphore)): d for d in domains}
+    pending = set(tasks)
+    try:
+        while pending and not stop.reason():
+            left = stop.remaining()
+            done, pending = await asyncio.wait(pending, timeout=None if left == float("inf") else left,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                d = tasks[task]
+                try:
+                    res = task.result()
+                except Exception as e:
+                    res = {"domain": d, "status": "failed", "http_code": None, "error": str(e), "provider": None}
+                results[d] = res
+                stop.add(res)
+                progress.update(res)
+    finally:
+        for task in pending:
+            task.cancel()
+        refresher.cancel()
+        await asyncio.gather(*pending, refresher, return_exceptions=True)
+        progress.render()
+    return results
+
+
 async def main():
+    session = None
+    progress = None
     try:
         ensure_output_dir()
+        # 初始查询和各轮重试共用一个会话，保留长连接和 DNS 缓存
+        session = create_session()
 
-        # 1. 生成 & 保存所有域名
-        domains = generate_domains()
+        # 1. 生成 & 按优先级排序 & 保存所有域名
+        domains = prioritize(generate_domains(), PRIORITY, load_wordlist(WORDLIST_FILE))
         save_domains(domains)
         total = len(domains)
         print(f"已生成 {total} 个 {DOMAIN_SUFFIX} 域名，写入 {INPUT_FILE}")
@@ -136,20 +350,10 @@ async def main():
         results = {}  # domain -> result dict
         print("开始初始查询…")
 
-        async with aiohttp.ClientSession() as session:
-            semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
-            tasks = [check_domain(d, session, semaphore) for d in domains]
-            completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for idx, (d, res) in enumerate(zip(domains, completed_tasks), start=1):
-                if isinstance(res, Exception):
-                    res = {"domain": d, "status": "failed", "http_code": None, "error": str(res)}
-                results[d] = res
-
-                mark = {"registered": "🔴 已注册", "unregistered": "🟢 未注册", "failed": "🟡 查询失败"}[res["status"]]
-                detail = f"(HTTP {res['http_code']})" + (f" 错误：{res['error']}" if res["error"] else "")
-                percent = idx / total * 100
-                print(f"{d}: {mark} {detail}   [{idx}/{total}, {percent:.2f}%]")
+        progress = Progress(LOG_FILE)
+        stop = EarlyStop(FIRST_K, DEADLINE)
+        finished = await run_round(domains, session, progress, "初始查询", stop)
+        results = {d: finished[d] for d in domains if d in finished}  # 恢复优先级顺序
 
         # 3. 写入初始失败列表
         error_domains = [d for d, r in results.items() if r["status"] == "failed"]
@@ -158,27 +362,13 @@ async def main():
 
         # 4. 针对失败域名重试
         for attempt in range(1, MAX_RETRIES + 1):
-            if not error_domains:
+            if not error_domains or stop.reason():
                 break
             print(f"第 {attempt} 次重试，共 {len(error_domains)} 个域名…")
-            new_errors = []
-            async with aiohttp.ClientSession() as session:
-                semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
-                tasks = [check_domain(d, session, semaphore) for d in error_domains]
-                completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for idx, (d, res) in enumerate(zip(error_domains, completed_tasks), start=1):
-                    if isinstance(res, Exception):
-                        res = {"domain": d, "status": "failed", "http_code": None, "error": str(res)}
-                    results[d] = res
-
-                    mark = {"registered": "🔴 已注册", "unregistered": "🟢 未注册", "failed": "🟡 查询失败"}[res["status"]]
-                    detail = f"(HTTP {res['http_code']})" + (f" 错误：{res['error']}" if res["error"] else "")
-                    percent = idx / len(error_domains) * 100
-                    print(f"重试 {attempt} - {d}: {mark} {detail}   [{idx}/{len(error_domains)}, {percent:.2f}%]")
-
-                    if res["status"] == "failed":
-                        new_errors.append(d)
+            finished = await run_round(error_domains, session, progress, f"重试 {attempt}", stop)
+            results.update(finished)
+            # 被取消、未完成重试的域名仍算失败
+            new_errors = [d for d in error_domains if results[d]["status"] == "failed"]
 
             error_domains = new_errors
             write_list_to_file(error_domains, ERROR_FILE)
@@ -188,14 +378,23 @@ async def main():
         unreg = [d for d, r in results.items() if r["status"] == "unregistered"]
         write_list_to_file(unreg, UNREGISTERED_FILE)
 
+        if stop.reason():
+            print(f"{stop.reason()}，已取消其余请求（已查询 {len(results)}/{total} 个）。")
         print(f"所有查询结束：未注册 {len(unreg)} 个（已写入 {UNREGISTERED_FILE}），"
               f"最终失败 {len(error_domains)} 个（见 {ERROR_FILE}）。")
+        if VERBOSITY > 0:
+            print(f"详细结果见 {LOG_FILE}")
     except KeyboardInterrupt:
         print("\n程序已终止。")
         sys.exit(0)
     except Exception as e:
         print(f"\n发生未知异常: {str(e)}")
         sys.exit(1)
+    finally:
+        if progress:
+            progress.close()  # 异常退出时也把缓冲中的日志写入磁盘
+        if session:
+            await session.close()
 
 if __name__ == "__main__":
     asyncio.run(main())